@@ -1,5 +1,23 @@
 import re
 
+# 邮箱验证的正则表达式（模块加载时预编译，避免每次调用时查找re缓存；
+# 只涉及ASCII字符，使用re.ASCII关闭Unicode匹配）
+# 一次匹配即可覆盖下面is_valid_email中逐条进行的全部格式检查
+# 正则表达式分解说明：
+# [a-zA-Z0-9_%+-]+             - 用户名第一段：允许字母、数字、下划线、百分号、加号、减号
+# (?:\.[a-zA-Z0-9_%+-]+)*      - 用户名后续各段：以单个点分隔
+#                               （确保用户名不以点开头或结尾，且没有连续的点）
+# @                            - 必须包含且只包含一个@符号作为用户名和域名的分隔符
+# (?:                          - 域名的每个部分（最后的顶级域名除外），后面跟一个点：
+#   [a-zA-Z0-9]+               -   以字母或数字开头
+#   (?:-[a-zA-Z0-9]+)*         -   中间可以有单个减号，但不能以减号结尾，也不能有连续的减号
+# \.)+                         - 至少一个部分，保证有点分隔域名主体和顶级域名
+# [a-zA-Z]{2,6}                - 顶级域名：必须是2-6个字母（如com、org、net、info等）
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9_%+-]+(?:\.[a-zA-Z0-9_%+-]+)*@(?:[a-zA-Z0-9]+(?:-[a-zA-Z0-9]+)*\.)+[a-zA-Z]{2,6}', re.ASCII)
+
+# 邮箱地址中明显不允许出现的字符（空白、反斜杠、引号），str.translate会删除这些字符
+_FORBIDDEN_CHARS = str.maketrans('', '', ' \t\n\r\\"\'')
+
 def is_valid_email(email):
     """
     检查邮箱地址的有效性
@@ -12,8 +30,10 @@ def is_valid_email(email):
     """
     # 如果输入是列表或元组，进行批量验证
     if isinstance(email, (list, tuple)):
+        # 先去重（保持原有顺序），重复出现的地址只验证一次
+        unique = list(dict.fromkeys(email))
         results = {}
-        for e in email:
+        for e in unique:
             results[e] = is_valid_email(e)
         return results
     
@@ -22,73 +42,76 @@ def is_valid_email(email):
     if not isinstance(email, str):
         return False, "输入参数类型错误"
     
-    # 邮箱验证的正则表达式
-    # 正则表达式分解说明：
-    # ^                    - 字符串开头
-    # [a-zA-Z0-9._%+-]*    - 用户名前缀部分：允许字母、数字、下划线、点、百分号、加号、减号，0次或多次出现
-    # [a-zA-Z0-9._%+-]     - 用户名最后一个字符：必须是字母、数字、下划线、点、百分号、加号或减号
-    #                       （确保用户名不以点结尾）
-    # @                    - 必须包含@符号作为用户名和域名的分隔符
-    # [a-zA-Z0-9.-]*       - 域名前缀部分：允许字母、数字、点、减号，0次或多次出现
-    # [a-zA-Z0-9.-]        - 域名最后一个字符：必须是字母、数字、点或减号
-    #                       （确保域名不以点结尾）
-    # \.                   - 必须包含一个点来分隔域名主体和顶级域名
-    # [a-zA-Z]{2,6}        - 顶级域名：必须是2-6个字母（如com、org、net、info等）
-    # $                    - 字符串结尾
-    pattern = r'^[a-zA-Z0-9._%+-]*[a-zA-Z0-9._%+-]@[a-zA-Z0-9.-]*[a-zA-Z0-9.-]\.[a-zA-Z]{2,6}$'
+    # 快速路径：一次完整的正则匹配，匹配成功即为有效邮箱
+    if _EMAIL_RE.fullmatch(email):
+        return True, "邮箱验证正确"
+    
+    # 匹配失败时才逐条检查，找出具体的错误原因
+    return False, _email_error(email)
+
+def _email_error(email):
+    """
+    找出无效邮箱地址的具体错误原因
+    
+    参数:
+    email (str): 已确认不符合邮箱格式的邮箱地址
+    
+    返回:
+    str: 错误原因
+    """
+    # 非法字符检查：一次C层扫描，先排除包含空白、反斜杠、引号的邮箱
+    if email.translate(_FORBIDDEN_CHARS) != email:
+        return "邮箱地址包含非法字符"
     
     # 2. @符号检查：确保邮箱包含且只包含一个@符号
     #    缺少@符号或有多个@符号的邮箱都是无效的
-    if '@' not in email:
-        return False, "邮箱地址必须包含@符号"
-    if email.count('@') > 1:
-        return False, "邮箱地址只能包含一个@符号"
+    #    按第一个@符号一次性拆分出用户名和域名部分
+    username, at, domain = email.partition('@')
+    if not at:
+        return "邮箱地址必须包含@符号"
+    if '@' in domain:
+        return "邮箱地址只能包含一个@符号"
     
     # 3. 连续点检查：确保邮箱中没有连续的点
     #    连续的点（如"user..name@example.com"）是无效的邮箱格式
     if '..' in email:
-        return False, "邮箱地址中不能包含连续的点"
+        return "邮箱地址中不能包含连续的点"
     
     # 4. 用户名格式检查：确保用户名不以点开头或结尾
-    #    将邮箱按@符号分割，获取用户名部分
-    username = email.split('@')[0]
-    #    以点开头或结尾的用户名是无效的
-    if username.startswith('.'):
-        return False, "用户名不能以点开头"
-    if username.endswith('.'):
-        return False, "用户名不能以点结尾"
+    #    以点开头或结尾的用户名是无效的（直接按下标取首尾字符，空用户名由最后的格式检查处理）
+    if username:
+        if username[0] == '.':
+            return "用户名不能以点开头"
+        if username[-1] == '.':
+            return "用户名不能以点结尾"
     
     # 5. 域名格式检查：确保域名不以点或减号开头或结尾
-    #    将邮箱按@符号分割，获取域名部分
-    domain = email.split('@')[1]
-    #    以点或减号开头/结尾的域名是无效的
-    if domain.startswith('.'):
-        return False, "域名不能以点开头"
-    if domain.endswith('.'):
-        return False, "域名不能以点结尾"
-    if domain.startswith('-'):
-        return False, "域名不能以减号开头"
-    if domain.endswith('-'):
-        return False, "域名不能以减号结尾"
-    
-    # 6. 域名部分检查：确保域名的每个部分都不以减号开头或结尾
-    #    将域名按点分割成各个部分（如example.com分割为["example", "com"]）
-    domain_parts = domain.split('.')
-    for part in domain_parts:
-        #    域名的任何一个部分都不能以减号开头或结尾
-        if part.startswith('-'):
-            return False, "域名的部分不能以减号开头"
-        if part.endswith('-'):
-            return False, "域名的部分不能以减号结尾"
+    #    以点或减号开头/结尾的域名是无效的（空域名由最后的格式检查处理）
+    if domain:
+        if domain[0] == '.':
+            return "域名不能以点开头"
+        if domain[-1] == '.':
+            return "域名不能以点结尾"
+        if domain[0] == '-':
+            return "域名不能以减号开头"
+        if domain[-1] == '-':
+            return "域名不能以减号结尾"
+        
+        # 6. 域名部分检查：确保域名的每个部分都不以减号开头或结尾
+        #    将域名按点分割成各个部分（如example.com分割为["example", "com"]）
+        #    前面已排除连续的点和以点开头/结尾，因此每个部分都不为空
+        domain_parts = domain.split('.')
+        for part in domain_parts:
+            #    域名的任何一个部分都不能以减号开头或结尾
+            if part[0] == '-':
+                return "域名的部分不能以减号开头"
+            if part[-1] == '-':
+                return "域名的部分不能以减号结尾"
     
     # 8. 连续减号检查：确保域名部分不包含连续的减号
     if '--' in domain:
-        return False, "域名部分不能包含连续的减号"
-    
-    # 9. 最终正则匹配检查：使用完整的正则表达式验证邮箱格式
-    #    虽然前面已经进行了多步检查，但最终的正则匹配可以确保整体格式正确
-    if not re.fullmatch(pattern, email):
-        return False, "邮箱格式不符合标准规范"
+        return "域名部分不能包含连续的减号"
     
-    return True, "邮箱验证正确"
+    # 9. 以上检查都通过但整体格式仍不正确（如缺少用户名、包含非法字符、顶级域名长度不对）
+    return "邮箱格式不符合标准规范"
 
@@ -1,4 +1,7 @@
 import unittest
+from unittest import mock
+
+import email_validator
 from email_validator import is_valid_email
 
 class TestEmailValidator(unittest.TestCase):
@@ -81,10 +84,12 @@ class TestEmailValidator(unittest.TestCase):
             "user",                  # 无效
             "user.name@example.com", # 有效
             "user@.com",             # 无效
+            "user@example.com",      # 重复
         ]
         
         results = is_valid_email(emails)
         self.assertIsInstance(results, dict, "批量验证应该返回字典类型")
+        self.assertEqual(len(results), 4, "重复的邮箱在结果中只应出现一次")
         
         for email, (result, message) in results.items():
             with self.subTest(email=email):
@@ -96,6 +101,21 @@ class TestEmailValidator(unittest.TestCase):
                 else:
                     self.assertFalse(result, f"邮箱 {email} 应该被认为是无效的")
                     self.assertNotEqual(message, "邮箱验证正确")
+    
+    def test_batch_deduplication(self):
+        """
+        测试批量验证时重复的邮箱只验证一次
+        """
+        emails = ["user@example.com", "user", "user@example.com", "user", "user@example.com"]
+        
+        # 批量验证逐个调用模块中的is_valid_email，包装后可以统计每个邮箱被验证的次数
+        with mock.patch.object(email_validator, "is_valid_email", wraps=is_valid_email) as wrapped:
+            results = is_valid_email(emails)
+        
+        checked = [call.args[0] for call in wrapped.call_args_list]
+        self.assertEqual(checked, ["user@example.com", "user"], "重复的邮箱应该只验证一次")
+        self.assertEqual(results, {e: is_valid_email(e) for e in ["user@example.com", "user"]})
+
 
 if __name__ == "__main__":
     unittest.main()
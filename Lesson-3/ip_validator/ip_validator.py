@@ -1,4 +1,8 @@
-import re
+# IPv4地址所有合法数字段的写法："0"到"255"，不带前导零
+_IPV4_OCTETS = frozenset(str(n) for n in range(256))
+
+# 0-255中所有非16进制字符的字节，bytes.translate删除这些字节后长度不变即说明全部是16进制字符
+_NON_HEX_BYTES = bytes(b for b in range(256) if chr(b) not in '0123456789abcdefABCDEF')
 
 def is_valid_ip(ip):
     """
@@ -13,8 +17,10 @@ def is_valid_ip(ip):
     """
     # 批量验证处理
     if isinstance(ip, (list, tuple)):
+        # 先去重（保持原有顺序），重复出现的地址只验证一次
+        unique = list(dict.fromkeys(ip))
         results = {}
-        for i in ip:
+        for i in unique:
             results[i] = is_valid_ip(i)
         return results
     
@@ -42,22 +48,60 @@ def _is_valid_ipv4(ip):
     返回:
         tuple: (bool, str) 验证结果元组
     """
-    # IPv4地址正则表达式：匹配4个0-255的数字段，每个段之间用点分隔
-    # 每个数字段不能以0开头（除非该段本身就是0）
-    ipv4_pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
-    
-    # 先检查是否符合基本格式
-    if not re.fullmatch(ipv4_pattern, ip):
+    # 必须是4个用点分隔的数字段
+    parts = ip.split('.')
+    if len(parts) != 4:
         return False, "IPv4地址格式错误，必须是4个0-255的数字段，用点分隔"
     
-    # 检查是否有前导零（除了单个0的情况）
-    parts = ip.split('.')
+    # 常见情况：4个数字段都是合法的写法，每段只需一次集合查找
+    if all(part in _IPV4_OCTETS for part in parts):
+        return True, "IP验证正确"
+    
+    # 存在非法数字段时逐段检查，给出具体的错误原因
+    # 先检查所有数字段的基本格式：1-3位ASCII数字、不超过255
+    for part in parts:
+        if not part or len(part) > 3 or not part.isascii() or not part.isdigit() or int(part) > 255:
+            return False, "IPv4地址格式错误，必须是4个0-255的数字段，用点分隔"
+    
+    # 格式都正确时再检查是否有前导零（除了单个0的情况）
     for i, part in enumerate(parts):
-        if len(part) > 1 and part.startswith('0'):
+        if len(part) > 1 and part[0] == '0':
             return False, f"IPv4地址第{i+1}部分不能有前导零"
     
     return True, "IP验证正确"
 
+def _count_ipv6_groups(part, allow_ipv4_tail):
+    """
+    统计IPv6地址中一段冒号分隔内容的16进制段数量
+    
+    参数:
+        part (str): 以冒号分隔的若干段，不包含::压缩标记
+        allow_ipv4_tail (bool): 最后一段是否允许为内嵌的IPv4地址
+    
+    返回:
+        int or None: 段数（内嵌IPv4地址计为2段），格式非法时返回None
+    """
+    if not part:
+        return 0
+    
+    groups = part.split(":")
+    count = len(groups)
+    
+    # 内嵌IPv4地址只能出现在整个地址的最后一段，占用2个16进制段
+    if allow_ipv4_tail and "." in groups[-1]:
+        if not _is_valid_ipv4(groups.pop())[0]:
+            return None
+        count += 1
+    
+    # 每个16进制段必须是1-4个16进制字符（字符检查由bytes.translate在C层完成）
+    for group in groups:
+        if not group or len(group) > 4 or not group.isascii():
+            return None
+        if len(group.encode().translate(None, _NON_HEX_BYTES)) != len(group):
+            return None
+    
+    return count
+
 def _is_valid_ipv6(ip):
     """
     IPv6地址验证函数
@@ -68,27 +112,29 @@ def _is_valid_ipv6(ip):
     返回:
         tuple: (bool, str) 验证结果元组
     """
+    # 去掉首尾空白，并分离区域标识（如fe80::1%eth0）
+    address, percent, zone = ip.strip().partition("%")
+    # 区域标识不能为空，也不能包含空白、控制字符或另一个%
+    if percent and (not zone or not zone.isprintable() or " " in zone or "%" in zone):
+        return False, "IPv6地址格式错误，必须是8个16进制段，用冒号分隔，支持压缩格式::"
+    
     # 检查是否包含多个::压缩标记
-    if ip.count("::") > 1:
+    if address.count("::") > 1:
         return False, "IPv6地址只能有一个::压缩标记"
     
-    # IPv6地址正则表达式
-    # 支持标准格式和压缩格式
-    ipv6_pattern = r'^\s*((([0-9A-Fa-f]{1,4}:){7}([0-9A-Fa-f]{1,4}|:))|(([0-9A-Fa-f]{1,4}:){6}(:[0-9A-Fa-f]{1,4}|((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3})|:))|(([0-9A-Fa-f]{1,4}:){5}(((:[0-9A-Fa-f]{1,4}){1,2})|:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3})|:))|(([0-9A-Fa-f]{1,4}:){4}(((:[0-9A-Fa-f]{1,4}){1,3})|((:[0-9A-Fa-f]{1,4})?:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}))|:))|(([0-9A-Fa-f]{1,4}:){3}(((:[0-9A-Fa-f]{1,4}){1,4})|((:[0-9A-Fa-f]{1,4}){0,2}:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}))|:))|(([0-9A-Fa-f]{1,4}:){2}(((:[0-9A-Fa-f]{1,4}){1,5})|((:[0-9A-Fa-f]{1,4}){0,3}:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}))|:))|(([0-9A-Fa-f]{1,4}:){1}(((:[0-9A-Fa-f]{1,4}){1,6})|((:[0-9A-Fa-f]{1,4}){0,4}:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}))|:))|(:(((:[0-9A-Fa-f]{1,4}){1,7})|((:[0-9A-Fa-f]{1,4}){0,5}:((25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}))|:)))(%.+)?\s*$'
-    
-    # 检查是否符合IPv6格式
-    if not re.fullmatch(ipv6_pattern, ip):
+    # 按::拆分为左右两部分，分别逐段线性解析
+    left, compressed, right = address.partition("::")
+    left_count = _count_ipv6_groups(left, allow_ipv4_tail=not compressed)
+    right_count = _count_ipv6_groups(right, allow_ipv4_tail=True)
+    if left_count is None or right_count is None:
         return False, "IPv6地址格式错误，必须是8个16进制段，用冒号分隔，支持压缩格式::"
     
     # 检查压缩后的部分数量是否合法
-    if "::" in ip:
-        non_empty_parts = [p for p in ip.split(":") if p]
-        if len(non_empty_parts) > 7:
+    if compressed:
+        if left_count + right_count > 7:
             return False, "IPv6地址压缩格式错误，压缩后部分数量必须在0-7之间"
     # 非压缩格式必须有8个部分
-    else:
-        parts = ip.split(":")
-        if len(parts) != 8:
-            return False, "IPv6地址必须包含8个16进制段"
+    elif left_count != 8:
+        return False, "IPv6地址必须包含8个16进制段"
     
-    return True, "IP验证正确"
\ No newline at end of file
+    return True, "IP验证正确"
@@ -1,4 +1,7 @@
 import unittest
+from unittest import mock
+
+import ip_validator
 from ip_validator import is_valid_ip
 
 class TestIPValidator(unittest.TestCase):
@@ -44,6 +47,21 @@ class TestIPValidator(unittest.TestCase):
                 result, message = is_valid_ip(ip)
                 self.assertFalse(result, f"无效IPv4地址 {ip} 验证失败: {message}")
     
+    def test_ipv4_error_messages(self):
+        """测试IPv4错误消息：先检查所有数字段的格式和范围，再检查前导零"""
+        format_error = "IPv4地址格式错误，必须是4个0-255的数字段，用点分隔"
+        cases = {
+            "01.1.1.256": format_error,  # 前导零后面还有超出范围的段
+            "01.a.1.1": format_error,  # 前导零后面还有非数字段
+            "1.01.1.abc": format_error,
+            "192.168.01.1": "IPv4地址第3部分不能有前导零",
+            "01.1.1.001": "IPv4地址第1部分不能有前导零",
+        }
+        
+        for ip, expected in cases.items():
+            with self.subTest(ip=ip):
+                self.assertEqual(is_valid_ip(ip), (False, expected))
+    
     def test_valid_ipv6(self):
         """测试有效的IPv6地址"""
         valid_ipv6_list = [
@@ -54,7 +72,8 @@ class TestIPValidator(unittest.TestCase):
             "::",  # 未指定地址
             "fe80::1ff:fe23:4567:890a",  # 链路本地地址
             "2001:0db8:1234:5678:9abc:def0:1234:5678",  # 标准格式
-            "2001:0db8::1234:5678"  # 压缩格式
+            "2001:0db8::1234:5678",  # 压缩格式
+            "fe80::1%eth0"  # 带区域标识
         ]
         
         for ip in valid_ipv6_list:
@@ -76,7 +95,11 @@ class TestIPValidator(unittest.TestCase):
             "2001:0db8:85a3:0000:0000:8a2e:0370:733g",  # 无效字符
             "2001:0db8:85a3:::8a2e:0370:7334",  # 多个连续冒号
             "2001:0db8:85a3:0000:0000:8a2e:0370:7334x",  # 结尾有无效字符
-            "x2001:0db8:85a3:0000:0000:8a2e:0370:7334"  # 开头有无效字符
+            "x2001:0db8:85a3:0000:0000:8a2e:0370:7334",  # 开头有无效字符
+            "fe80::1%",  # 区域标识为空
+            "fe80::1%eth0\nX",  # 区域标识包含换行
+            "fe80::1%a b",  # 区域标识包含空格
+            "fe80::1%%%"  # 区域标识包含%
         ]
         
         for ip in invalid_ipv6_list:
@@ -105,6 +128,18 @@ class TestIPValidator(unittest.TestCase):
         self.assertIsInstance(results_tuple, dict)
         self.assertEqual(len(results_tuple), len(ip_tuple))
     
+    def test_batch_deduplication(self):
+        """测试批量验证时重复的IP地址只验证一次"""
+        ip_list = ["192.168.1.1", "2001:db8::1", "192.168.1.1", "2001:db8::1", "192.168.1.1"]
+        
+        # 批量验证逐个调用模块中的is_valid_ip，包装后可以统计每个地址被验证的次数
+        with mock.patch.object(ip_validator, "is_valid_ip", wraps=is_valid_ip) as wrapped:
+            results = is_valid_ip(ip_list)
+        
+        checked = [call.args[0] for call in wrapped.call_args_list]
+        self.assertEqual(checked, ["192.168.1.1", "2001:db8::1"], "重复的IP地址应该只验证一次")
+        self.assertEqual(results, {ip: is_valid_ip(ip) for ip in ["192.168.1.1", "2001:db8::1"]})
+    
     def test_invalid_types(self):
         """测试无效的输入类型"""
         invalid_types = [
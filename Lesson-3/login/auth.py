@@ -3,42 +3,110 @@
 """
 import time
 import json
+import base64
+import dbm
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+import hmac
+import functools
+import shelve
+import sqlite3
 import os
+from dataclasses import dataclass
 
+# 优先使用orjson（原生实现，序列化/解析更快），未安装时退回标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_dumps(data) -> bytes:
+    """将用户数据序列化为缩进2格的JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _json_loads(raw: bytes):
+    """解析JSON字节串，格式错误时抛出json.JSONDecodeError（orjson的异常是其子类）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# 第1-4次登录失败时的提示消息，按失败次数预先生成，避免每次格式化字符串
+_ATTEMPT_MSGS = tuple(f"用户名或密码错误，还剩{5 - n}次尝试机会" for n in range(1, 5))
+
+@functools.lru_cache(maxsize=1024)
+def _sha256_digest(password: str) -> bytes:
+    """计算密码的SHA-256摘要（32字节），缓存最近的结果以避免重复哈希相同的密码"""
+    return hashlib.sha256(password.encode()).digest()
+
+# 使用slots代替实例__dict__，减少每个账户对象的内存占用并加快属性访问
+@dataclass(slots=True)
 class UserAccount:
     """用户账户类"""
-    def __init__(self, username: str, password_hash: str, is_locked: bool = False, 
-                 lock_until: Optional[float] = None, failed_attempts: int = 0):
-        self.username = username
-        self.password_hash = password_hash
-        self.is_locked = is_locked
-        self.lock_until = lock_until
-        self.failed_attempts = failed_attempts
+    username: str
+    password_hash: bytes  # SHA-256原始摘要（32字节）
+    is_locked: bool = False
+    lock_until: float | None = None
+    failed_attempts: int = 0
 
 class AuthSystem:
     """认证系统类"""
     
-    def __init__(self, storage_file: str = "users.json", lock_duration_minutes: int = 10):
+    # 各存储后端的默认存储文件，互不相同，避免用其他后端的格式打开同一个文件
+    STORAGE_BACKENDS = {"json": "users.json", "shelve": "users.db", "sqlite": "users.sqlite3"}
+    
+    def __init__(self, storage_file: str | None = None, lock_duration_minutes: int = 10,
+                 backend: str = "json", clock=time.time):
         """
         初始化认证系统
         
         Args:
-            storage_file: 用户数据存储文件
+            storage_file: 用户数据存储文件，为None时使用所选后端的默认文件
             lock_duration_minutes: 锁定持续时间（分钟）
+            backend: 存储后端，"json"每次保存重写整个文件，"shelve"和"sqlite"按用户单条写入
+            clock: 返回当前时间戳（秒）的函数，测试时可替换
         """
-        self.storage_file = storage_file
+        if backend not in self.STORAGE_BACKENDS:
+            raise ValueError(f"不支持的存储后端: {backend}")
+        
+        self.storage_file = storage_file or self.STORAGE_BACKENDS[backend]
         self.lock_duration = lock_duration_minutes * 60  # 转换为秒
-        self.users: Dict[str, UserAccount] = {}
-        self.load_users()
+        self.backend = backend
+        self._clock = clock
+        self._users: dict[str, UserAccount] | None = None  # 首次访问users时才从文件加载
+        self._dirty = set()  # 有尚未写入文件的修改的用户名
+        self._defer_depth = 0  # 嵌套的批量操作层数，大于0时推迟写文件
+        self._db: shelve.Shelf | None = None  # shelve后端的数据库句柄，首次使用时打开
+        self._conn: sqlite3.Connection | None = None  # sqlite后端的数据库连接，首次使用时打开
     
-    def _hash_password(self, password: str) -> str:
-        """密码哈希处理"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    @property
+    def users(self) -> dict[str, UserAccount]:
+        """用户数据字典，首次访问时才从文件加载，创建实例本身不读取文件"""
+        if self._users is None:
+            self.load_users()
+        return self._users
     
-    def _is_password_valid(self, password: str) -> Tuple[bool, str]:
+    @users.setter
+    def users(self, users: dict[str, UserAccount]):
+        self._users = users
+    
+    def __enter__(self):
+        """进入批量操作：期间的修改只标记，退出时统一写入文件一次"""
+        self._defer_depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """退出批量操作，最外层退出时写入所有未保存的修改"""
+        self._defer_depth -= 1
+        if not self._defer_depth:
+            self.flush()
+        return False
+    
+    def _hash_password(self, password: str) -> bytes:
+        """密码哈希处理，返回32字节的原始摘要"""
+        return _sha256_digest(password)
+    
+    def _is_password_valid(self, password: str) -> tuple[bool, str]:
         """
         检查密码复杂度是否符合要求
         
@@ -70,40 +138,172 @@ class AuthSystem:
         
         return True, "密码复杂度符合要求"
     
+    @staticmethod
+    def _account_to_record(account: UserAccount) -> dict:
+        """将用户账户转换为可存储的字典，密码哈希保持原始字节（JSON后端保存时再转换为base64文本）"""
+        return {
+            'password_hash': account.password_hash,
+            'is_locked': account.is_locked,
+            'lock_until': account.lock_until,
+            'failed_attempts': account.failed_attempts
+        }
+    
+    @staticmethod
+    def _account_from_record(username: str, user_data: dict) -> UserAccount:
+        """从存储的字典还原用户账户"""
+        stored_hash = user_data['password_hash']
+        if isinstance(stored_hash, bytes):
+            # shelve和sqlite后端直接保存原始字节
+            password_hash = stored_hash
+        else:
+            try:
+                # 兼容旧版本保存的64位十六进制哈希
+                if len(stored_hash) == 64:
+                    password_hash = bytes.fromhex(stored_hash)
+                else:
+                    password_hash = base64.b64decode(stored_hash, validate=True)
+            except ValueError:
+                # 哈希已损坏：保留该用户，但空摘要与任何密码都不匹配，只是该用户无法登录
+                password_hash = b""
+        return UserAccount(
+            username=username,
+            password_hash=password_hash,
+            is_locked=user_data.get('is_locked', False),
+            lock_until=user_data.get('lock_until'),
+            failed_attempts=user_data.get('failed_attempts', 0)
+        )
+    
+    def _open_shelve(self) -> shelve.Shelf:
+        """获取shelve数据库句柄，首次调用时打开并在实例上保持打开，之后的读写复用同一个句柄"""
+        if self._db is None:
+            # whichdb对存在但无法识别格式的文件（如JSON用户文件）返回空字符串
+            if dbm.whichdb(self.storage_file) == "":
+                raise ValueError(f"存储文件不是shelve数据库: {self.storage_file}")
+            self._db = shelve.open(self.storage_file)
+        return self._db
+    
+    def _connect_sqlite(self) -> sqlite3.Connection:
+        """
+        获取SQLite数据库连接，首次调用时打开并在实例上保持打开，之后的读写复用同一个连接
+        
+        打开时设置一次WAL日志模式（提交时不必每次等待fsync），并确保用户表存在
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.storage_file)
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS users ("
+                    "username TEXT PRIMARY KEY, password_hash BLOB NOT NULL, is_locked INTEGER NOT NULL, "
+                    "lock_until REAL, failed_attempts INTEGER NOT NULL)"
+                )
+            except sqlite3.DatabaseError as e:
+                # 与shelve后端一致：存在但不是SQLite数据库的文件（如JSON用户文件）给出明确的错误
+                conn.close()
+                raise ValueError(f"存储文件不是SQLite数据库: {self.storage_file}") from e
+            self._conn = conn
+        return self._conn
+    
+    def close(self):
+        """关闭保持打开的存储连接，之后再次读写时会重新打开"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     def load_users(self):
-        """从文件加载用户数据"""
-        if os.path.exists(self.storage_file):
+        """
+        从文件加载用户数据
+        
+        先读入局部字典，全部记录都还原成功后才替换self._users；加载中途出错时
+        self._users保持未加载状态，不会留下只含部分用户的字典（否则下次保存会丢失其余用户）
+        """
+        users = {}
+        if self.backend == "json":
+            if not os.path.exists(self.storage_file):
+                # 文件不存在，创建默认管理员用户
+                self._users = users
+                self._create_default_users()
+                return
             try:
-                with open(self.storage_file, 'r') as f:
-                    data = json.load(f)
-                    for username, user_data in data.items():
-                        self.users[username] = UserAccount(
-                            username=username,
-                            password_hash=user_data['password_hash'],
-                            is_locked=user_data.get('is_locked', False),
-                            lock_until=user_data.get('lock_until'),
-                            failed_attempts=user_data.get('failed_attempts', 0)
-                        )
+                with open(self.storage_file, 'rb') as f:
+                    data = _json_loads(f.read())
             except (json.JSONDecodeError, FileNotFoundError):
                 # 如果文件损坏或不存在，使用空用户列表
-                self.users = {}
+                data = {}
+            for username, user_data in data.items():
+                users[username] = self._account_from_record(username, user_data)
+            self._users = users
+            return
+        
+        if self.backend == "shelve":
+            db = self._open_shelve()
+            for username in db:
+                users[username] = self._account_from_record(username, db[username])
         else:
-            # 文件不存在，创建默认管理员用户
+            for row in self._connect_sqlite().execute("SELECT * FROM users"):
+                user_data = dict(row)
+                user_data['is_locked'] = bool(user_data['is_locked'])
+                users[row['username']] = self._account_from_record(row['username'], user_data)
+        
+        self._users = users
+        if not users:
+            # 数据库为空，创建默认管理员用户
             self._create_default_users()
     
     def save_users(self):
-        """保存用户数据到文件"""
-        data = {}
-        for username, account in self.users.items():
-            data[username] = {
-                'password_hash': account.password_hash,
-                'is_locked': account.is_locked,
-                'lock_until': account.lock_until,
-                'failed_attempts': account.failed_attempts
-            }
-        
-        with open(self.storage_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """保存全部用户数据到文件"""
+        if self.backend != "json":
+            self._save_records(self.users)
+        else:
+            data = {}
+            for username, account in self.users.items():
+                record = self._account_to_record(account)
+                # JSON只能保存文本，密码哈希编码为base64
+                record['password_hash'] = base64.b64encode(record['password_hash']).decode()
+                data[username] = record
+            
+            with open(self.storage_file, 'wb') as f:
+                f.write(_json_dumps(data))
+        self._dirty.clear()
+    
+    def _save_records(self, usernames):
+        """只将指定用户的记录写入按用户存储的后端（shelve或sqlite）"""
+        if self.backend == "sqlite":
+            rows = []
+            for username in usernames:
+                record = self._account_to_record(self.users[username])
+                rows.append((username, record['password_hash'], int(record['is_locked']),
+                             record['lock_until'], record['failed_attempts']))
+            # 每个用户一行，INSERT OR REPLACE只改写对应的行
+            with self._connect_sqlite() as conn:
+                conn.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)", rows)
+        else:
+            db = self._open_shelve()
+            for username in usernames:
+                db[username] = self._account_to_record(self.users[username])
+            db.sync()
+    
+    def flush(self):
+        """如果有未保存的修改，将其写入文件"""
+        if not self._dirty:
+            return
+        if self.backend != "json":
+            # shelve和sqlite按用户存储，只需写入被修改的记录
+            self._save_records(self._dirty)
+            self._dirty.clear()
+        else:
+            self.save_users()
+    
+    def _mark_dirty(self, username: str):
+        """标记用户数据已修改；不在批量操作中时立即写入文件"""
+        self._dirty.add(username)
+        if not self._defer_depth:
+            self.flush()
     
     def _create_default_users(self):
         """创建默认用户（仅用于演示）"""
@@ -125,7 +325,7 @@ class AuthSystem:
         
         self.save_users()
     
-    def register_user(self, username: str, password: str) -> Tuple[bool, str]:
+    def register_user(self, username: str, password: str) -> tuple[bool, str]:
         """
         注册新用户
         
@@ -156,10 +356,10 @@ class AuthSystem:
             failed_attempts=0
         )
         
-        self.save_users()
+        self._mark_dirty(username)
         return True, "用户注册成功"
     
-    def check_lock_status(self, username: str) -> Tuple[bool, Optional[str]]:
+    def check_lock_status(self, username: str) -> tuple[bool, str | None]:
         """
         检查用户是否被锁定
         
@@ -176,7 +376,7 @@ class AuthSystem:
         
         # 如果账户被锁定且锁定期限未过
         if account.is_locked and account.lock_until:
-            current_time = time.time()
+            current_time = self._clock()
             if current_time < account.lock_until:
                 # 计算剩余时间
                 remaining_seconds = int(account.lock_until - current_time)
@@ -190,11 +390,11 @@ class AuthSystem:
                 account.is_locked = False
                 account.lock_until = None
                 account.failed_attempts = 0
-                self.save_users()
+                self._mark_dirty(username)
         
         return False, None
     
-    def login(self, username: str, password: str) -> Tuple[bool, str]:
+    def login(self, username: str, password: str) -> tuple[bool, str]:
         """
         用户登录
         
@@ -216,12 +416,12 @@ class AuthSystem:
         if is_locked:
             return False, lock_message
         
-        # 验证密码
-        password_hash = self._hash_password(password)
-        if password_hash == account.password_hash:
-            # 登录成功，重置失败次数
-            account.failed_attempts = 0
-            self.save_users()
+        # 验证密码：直接比较32字节摘要，且比较耗时与内容无关
+        if hmac.compare_digest(self._hash_password(password), account.password_hash):
+            # 登录成功，重置失败次数；失败次数本来就是0时无需重写文件
+            if account.failed_attempts:
+                account.failed_attempts = 0
+                self._mark_dirty(username)
             return True, "登录成功"
         else:
             # 登录失败，增加失败次数
@@ -230,13 +430,12 @@ class AuthSystem:
             # 如果失败次数达到5次，锁定账户
             if account.failed_attempts >= 5:
                 account.is_locked = True
-                account.lock_until = time.time() + self.lock_duration
+                account.lock_until = self._clock() + self.lock_duration
                 message = f"登录失败次数过多，账户已被锁定10分钟"
             else:
-                remaining_attempts = 5 - account.failed_attempts
-                message = f"用户名或密码错误，还剩{remaining_attempts}次尝试机会"
+                message = _ATTEMPT_MSGS[account.failed_attempts - 1]
             
-            self.save_users()
+            self._mark_dirty(username)
             return False, message
     
     def unlock_account(self, username: str) -> bool:
@@ -254,11 +453,11 @@ class AuthSystem:
             account.is_locked = False
             account.lock_until = None
             account.failed_attempts = 0
-            self.save_users()
+            self._mark_dirty(username)
             return True
         return False
     
-    def get_user_info(self, username: str) -> Optional[Dict]:
+    def get_user_info(self, username: str) -> dict | None:
         """
         获取用户信息
         
@@ -281,8 +480,10 @@ class AuthSystem:
         return None
 
 
-# 创建全局认证系统实例
-auth_system = AuthSystem()
+@functools.cache
+def get_auth_system() -> AuthSystem:
+    """获取全局认证系统实例，首次调用时才创建，导入模块本身没有副作用"""
+    return AuthSystem()
 
 if __name__ == "__main__":
     # 简单演示
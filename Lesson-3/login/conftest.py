@@ -0,0 +1,8 @@
+"""
+用户登录模块测试的pytest配置
+"""
+
+
+def pytest_configure(config):
+    """注册测试中使用的自定义标记"""
+    config.addinivalue_line("markers", "disk: 需要真正读写存储文件的测试，不替换save_users")
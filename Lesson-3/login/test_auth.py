@@ -1,308 +1,508 @@
 """
 用户登录模块的单元测试
 """
-import unittest
 import time
 import os
-import tempfile
-from unittest.mock import patch
+import dataclasses
+import hashlib
+import hmac
+import json
+
+import pytest
+
 from auth import AuthSystem, UserAccount
 
-class TestAuthSystem(unittest.TestCase):
-    """AuthSystem测试类"""
-    
-    def setUp(self):
-        """每个测试前的准备工作"""
-        # 创建临时文件用于存储测试数据
-        self.temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.json')
-        self.temp_file.close()
-        
-        # 创建认证系统实例，使用临时文件
-        self.auth = AuthSystem(storage_file=self.temp_file.name, lock_duration_minutes=10)
-    
-    def tearDown(self):
-        """每个测试后的清理工作"""
-        # 删除临时文件
-        try:
-            os.unlink(self.temp_file.name)
-        except:
-            pass
-    
-    def test_hash_password(self):
-        """测试密码哈希函数"""
-        auth = AuthSystem()
-        hash1 = auth._hash_password("testpassword")
-        hash2 = auth._hash_password("testpassword")
-        
-        # 相同的密码应该生成相同的哈希值
-        self.assertEqual(hash1, hash2)
-        
-        # 不同的密码应该生成不同的哈希值
-        hash3 = auth._hash_password("different")
-        self.assertNotEqual(hash1, hash3)
-    
-    def test_register_user(self):
-        """测试用户注册"""
-        # 成功注册
-        success, message = self.auth.register_user("testuser", "Testpass123")
-        self.assertTrue(success)
-        self.assertEqual(message, "用户注册成功")
-        self.assertIn("testuser", self.auth.users)
-        
-        # 注册已存在的用户
-        success, message = self.auth.register_user("testuser", "Anotherpass123")
-        self.assertFalse(success)
-        self.assertEqual(message, "用户名已存在")
-        
-        # 用户名太短
-        success, message = self.auth.register_user("ab", "password123")
-        self.assertFalse(success)
-        self.assertEqual(message, "用户名至少需要3个字符")
-        
-        # 密码太短（小于8位）
-        success, message = self.auth.register_user("validuser", "1234567")
-        self.assertFalse(success)
-        self.assertEqual(message, "密码长度必须在8-16位之间")
-        
-        # 密码太长（大于16位）
-        success, message = self.auth.register_user("validuser", "12345678901234567")
-        self.assertFalse(success)
-        self.assertEqual(message, "密码长度必须在8-16位之间")
-        
-        # 密码复杂度不足（只包含小写字母和数字）
-        success, message = self.auth.register_user("validuser", "password123")
-        self.assertFalse(success)
-        self.assertEqual(message, "密码必须包含大写字母、小写字母、数字、特殊符号中的三种")
-        
-        # 密码复杂度符合要求（包含大写字母、小写字母和数字）
-        success, message = self.auth.register_user("validuser", "Password123")
-        self.assertTrue(success)
-        self.assertEqual(message, "用户注册成功")
-        
-        # 密码复杂度符合要求（包含小写字母、数字和特殊符号）
-        success, message = self.auth.register_user("validuser2", "password123!")
-        self.assertTrue(success)
-        self.assertEqual(message, "用户注册成功")
-    
-    def test_login_success(self):
-        """测试登录成功"""
-        # 先注册用户
-        self.auth.register_user("testuser", "Testpass123")
-        
-        # 登录成功
-        success, message = self.auth.login("testuser", "Testpass123")
-        self.assertTrue(success)
-        self.assertEqual(message, "登录成功")
-        
-        # 验证失败次数已重置
-        account = self.auth.users["testuser"]
-        self.assertEqual(account.failed_attempts, 0)
-    
-    def test_login_user_not_exist(self):
-        """测试不存在的用户登录"""
-        success, message = self.auth.login("nonexistent", "password")
-        self.assertFalse(success)
-        self.assertEqual(message, "用户名或密码错误")
-    
-    def test_login_wrong_password(self):
-        """测试密码错误"""
-        # 先注册用户
-        self.auth.register_user("testuser", "Testpass123")
-        
-        # 密码错误
-        success, message = self.auth.login("testuser", "wrongpass")
-        self.assertFalse(success)
-        self.assertIn("还剩", message)
-        
-        # 验证失败次数增加
-        account = self.auth.users["testuser"]
-        self.assertEqual(account.failed_attempts, 1)
-    
-    def test_account_lock_after_five_failures(self):
-        """测试5次失败后账户锁定"""
-        # 先注册用户
-        self.auth.register_user("testuser", "Testpass123")
-        
-        # 连续5次错误密码登录
-        for i in range(5):
-            success, message = self.auth.login("testuser", "wrongpass")
-            if i < 4:
-                remaining = 4 - i
-                expected_message = f"用户名或密码错误，还剩{remaining}次尝试机会"
-                self.assertIn(f"还剩{remaining}次", message)
-            else:
-                # 第5次应该触发锁定
-                self.assertIn("账户已被锁定10分钟", message)
-        
-        # 验证账户状态
-        account = self.auth.users["testuser"]
-        self.assertTrue(account.is_locked)
-        self.assertIsNotNone(account.lock_until)
-        self.assertEqual(account.failed_attempts, 5)
-        
-        # 尝试用正确密码登录，应该失败（账户被锁定）
-        success, message = self.auth.login("testuser", "Testpass123")
-        self.assertFalse(success)
-        self.assertIn("账户已被锁定", message)
-    
-    def test_check_lock_status(self):
-        """测试锁定状态检查"""
-        # 注册并锁定用户
-        self.auth.register_user("testuser", "Testpass123")
-        account = self.auth.users["testuser"]
-        account.is_locked = True
-        account.lock_until = time.time() + 600  # 锁定10分钟
-        
-        # 检查锁定状态
-        is_locked, message = self.auth.check_lock_status("testuser")
-        self.assertTrue(is_locked)
-        self.assertIn("账户已被锁定", message)
-        
-        # 测试已过期的锁定
-        account.lock_until = time.time() - 100  # 锁定已过期
-        is_locked, message = self.auth.check_lock_status("testuser")
-        self.assertFalse(is_locked)
-        self.assertIsNone(message)
-        
-        # 验证账户已自动解锁
-        self.assertFalse(account.is_locked)
-        self.assertEqual(account.failed_attempts, 0)
-    
-    def test_unlock_account(self):
-        """测试解锁账户"""
-        # 注册并锁定用户
-        self.auth.register_user("testuser", "Testpass123")
-        account = self.auth.users["testuser"]
-        account.is_locked = True
-        account.lock_until = time.time() + 600
-        account.failed_attempts = 5
-        
-        # 解锁账户
-        result = self.auth.unlock_account("testuser")
-        self.assertTrue(result)
-        
-        # 验证账户状态
-        self.assertFalse(account.is_locked)
-        self.assertIsNone(account.lock_until)
-        self.assertEqual(account.failed_attempts, 0)
-        
-        # 尝试解锁不存在的用户
-        result = self.auth.unlock_account("nonexistent")
-        self.assertFalse(result)
-    
-    def test_get_user_info(self):
-        """测试获取用户信息"""
-        # 注册用户
-        self.auth.register_user("testuser", "Testpass123")
-        
-        # 获取用户信息
-        user_info = self.auth.get_user_info("testuser")
-        self.assertIsNotNone(user_info)
-        self.assertEqual(user_info['username'], "testuser")
-        self.assertFalse(user_info['is_locked'])
-        self.assertEqual(user_info['failed_attempts'], 0)
-        
-        # 获取不存在的用户信息
-        user_info = self.auth.get_user_info("nonexistent")
-        self.assertIsNone(user_info)
-    
-    @patch('time.time')
-    def test_lock_expiration(self, mock_time):
-        """测试锁定过期"""
-        # 设置初始时间
-        current_time = 1000
-        mock_time.return_value = current_time
-        
-        # 注册并锁定用户
-        self.auth.register_user("testuser", "Testpass123")
-        account = self.auth.users["testuser"]
-        account.is_locked = True
-        account.lock_until = current_time + 300  # 锁定5分钟
-        
-        # 模拟时间过去6分钟
-        mock_time.return_value = current_time + 360
-        
-        # 检查锁定状态，应该自动解锁
-        is_locked, _ = self.auth.check_lock_status("testuser")
-        self.assertFalse(is_locked)
-        self.assertFalse(account.is_locked)
-        self.assertIsNone(account.lock_until)
-        self.assertEqual(account.failed_attempts, 0)
-    
-    def test_save_and_load_users(self):
-        """测试用户数据的保存和加载"""
-        # 注册几个用户
-        self.auth.register_user("user1", "Pass12345!")
-        self.auth.register_user("user2", "Pass12345!")
-        
-        # 修改一些状态
-        account = self.auth.users["user1"]
-        account.failed_attempts = 3
-        
-        # 保存数据
-        self.auth.save_users()
-        
-        # 创建新的AuthSystem实例加载数据
-        new_auth = AuthSystem(storage_file=self.temp_file.name)
-        
-        # 验证数据正确加载
-        self.assertIn("user1", new_auth.users)
-        self.assertIn("user2", new_auth.users)
-        
-        account1 = new_auth.users["user1"]
-        self.assertEqual(account1.failed_attempts, 3)
-
-
-class TestUserAccount(unittest.TestCase):
-    """UserAccount测试类"""
-    
-    def test_user_account_creation(self):
-        """测试UserAccount创建"""
-        account = UserAccount(
-            username="testuser",
-            password_hash="abc123",
-            is_locked=True,
-            lock_until=1234567890.0,
-            failed_attempts=3
-        )
-        
-        self.assertEqual(account.username, "testuser")
-        self.assertEqual(account.password_hash, "abc123")
-        self.assertTrue(account.is_locked)
-        self.assertEqual(account.lock_until, 1234567890.0)
-        self.assertEqual(account.failed_attempts, 3)
-    
-    def test_user_account_default_values(self):
-        """测试UserAccount默认值"""
-        account = UserAccount(
-            username="testuser",
-            password_hash="abc123"
-        )
-        
-        self.assertEqual(account.username, "testuser")
-        self.assertEqual(account.password_hash, "abc123")
-        self.assertFalse(account.is_locked)
-        self.assertIsNone(account.lock_until)
-        self.assertEqual(account.failed_attempts, 0)
-
-
-def run_tests():
-    """运行所有测试"""
-    # 创建测试套件
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # 添加测试类
-    suite.addTests(loader.loadTestsFromTestCase(TestAuthSystem))
-    suite.addTests(loader.loadTestsFromTestCase(TestUserAccount))
+# 断言中用到的消息常量
+MSG_REGISTER_OK = "用户注册成功"
+MSG_USER_EXISTS = "用户名已存在"
+MSG_USERNAME_TOO_SHORT = "用户名至少需要3个字符"
+MSG_PASSWORD_LENGTH = "密码长度必须在8-16位之间"
+MSG_PASSWORD_COMPLEXITY = "密码必须包含大写字母、小写字母、数字、特殊符号中的三种"
+MSG_LOGIN_OK = "登录成功"
+MSG_LOGIN_FAILED = "用户名或密码错误"
+MSG_LOCKED = "账户已被锁定"
+MSG_LOCKED_NOW = "账户已被锁定10分钟"
+
+# 连续5次密码错误时依次返回的消息，None表示触发锁定
+EXPECTED_FAILURE_MESSAGES = (
+    "用户名或密码错误，还剩4次尝试机会",
+    "用户名或密码错误，还剩3次尝试机会",
+    "用户名或密码错误，还剩2次尝试机会",
+    "用户名或密码错误，还剩1次尝试机会",
+    None,
+)
+
+
+@pytest.fixture
+def storage_path(tmp_path):
+    """测试用的存储文件路径，临时目录由pytest负责创建和清理"""
+    return tmp_path / "users.json"
+
+
+@pytest.fixture
+def auth_system(storage_path):
+    """使用临时存储文件的认证系统实例"""
+    auth = AuthSystem(storage_file=str(storage_path), lock_duration_minutes=10)
+    auth.users = {}  # 从空用户列表开始，无需读取或创建存储文件
+    return auth
+
+
+@pytest.fixture(scope="session")
+def readonly_auth(tmp_path_factory):
+    """整个测试会话共享的认证系统实例，只用于不修改用户数据的测试"""
+    storage_file = tmp_path_factory.mktemp("ro") / "users.json"
+    auth = AuthSystem(storage_file=str(storage_file), lock_duration_minutes=10)
+    auth.users = {}
+    return auth
+
+
+@pytest.fixture(autouse=True)
+def _no_disk(monkeypatch, request):
+    """
+    除标记为disk的测试外，将save_users替换为空操作，避免每次修改都写JSON文件
     
-    # 运行测试
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    需要真正读写存储文件的测试用@pytest.mark.disk标记
+    """
+    if request.node.get_closest_marker("disk") is None:
+        monkeypatch.setattr(AuthSystem, "save_users", lambda self: None)
+
+
+@pytest.fixture(scope="session")
+def canned_hash():
+    """测试密码"Testpass123"的哈希值，整个测试会话只计算一次，无需创建认证系统实例"""
+    return hashlib.sha256(b"Testpass123").digest()
+
+
+def seed_user(auth, canned_hash, name="testuser"):
+    """直接向认证系统中放入一个用户，跳过注册流程和密码哈希计算"""
+    auth.users[name] = UserAccount(username=name, password_hash=canned_hash)
+    return auth.users[name]
+
+
+# ==================== AuthSystem测试 ====================
+
+def test_hash_password(readonly_auth):
+    """测试密码哈希函数"""
+    hash1 = readonly_auth._hash_password("testpassword")
+    hash2 = hashlib.sha256(b"testpassword").digest()
+
+    # 哈希值应该与独立计算的SHA-256摘要一致（_hash_password带有缓存，不能与自身的结果比较）
+    assert hmac.compare_digest(hash1, hash2)
+
+    # 不同的密码应该生成不同的哈希值
+    hash3 = readonly_auth._hash_password("different")
+    assert not hmac.compare_digest(hash1, hash3)
+
+
+def test_register_user(auth_system):
+    """测试用户注册"""
+    # 成功注册
+    success, message = auth_system.register_user("testuser", "Testpass123")
+    assert success
+    assert message == MSG_REGISTER_OK
+    assert "testuser" in auth_system.users
+
+    # 注册已存在的用户
+    success, message = auth_system.register_user("testuser", "Anotherpass123")
+    assert not success
+    assert message == MSG_USER_EXISTS
+
+    # 用户名太短
+    success, message = auth_system.register_user("ab", "password123")
+    assert not success
+    assert message == MSG_USERNAME_TOO_SHORT
+
+    # 密码太短（小于8位）
+    success, message = auth_system.register_user("validuser", "1234567")
+    assert not success
+    assert message == MSG_PASSWORD_LENGTH
+
+    # 密码太长（大于16位）
+    success, message = auth_system.register_user("validuser", "12345678901234567")
+    assert not success
+    assert message == MSG_PASSWORD_LENGTH
+
+    # 密码复杂度不足（只包含小写字母和数字）
+    success, message = auth_system.register_user("validuser", "password123")
+    assert not success
+    assert message == MSG_PASSWORD_COMPLEXITY
+
+    # 密码复杂度符合要求（包含大写字母、小写字母和数字）
+    success, message = auth_system.register_user("validuser", "Password123")
+    assert success
+    assert message == MSG_REGISTER_OK
+
+    # 密码复杂度符合要求（包含小写字母、数字和特殊符号）
+    success, message = auth_system.register_user("validuser2", "password123!")
+    assert success
+    assert message == MSG_REGISTER_OK
+
+
+def test_login_success(auth_system, canned_hash):
+    """测试登录成功"""
+    # 先放入用户
+    seed_user(auth_system, canned_hash)
+
+    # 登录成功
+    success, message = auth_system.login("testuser", "Testpass123")
+    assert success
+    assert message == MSG_LOGIN_OK
+
+    # 验证失败次数已重置
+    account = auth_system.users["testuser"]
+    assert account.failed_attempts == 0
+
+
+def test_login_user_not_exist(readonly_auth):
+    """测试不存在的用户登录"""
+    success, message = readonly_auth.login("nonexistent", "password")
+    assert not success
+    assert message == MSG_LOGIN_FAILED
+
+
+def test_login_wrong_password(auth_system, canned_hash):
+    """测试密码错误"""
+    # 先放入用户
+    seed_user(auth_system, canned_hash)
+
+    # 密码错误
+    success, message = auth_system.login("testuser", "wrongpass")
+    assert not success
+    assert "还剩" in message
+
+    # 验证失败次数增加
+    account = auth_system.users["testuser"]
+    assert account.failed_attempts == 1
+
+
+def test_account_lock_after_five_failures(auth_system, canned_hash):
+    """测试5次失败后账户锁定"""
+    # 先放入用户
+    seed_user(auth_system, canned_hash)
+
+    # 连续5次错误密码登录，前4次提示剩余次数，第5次应该触发锁定
+    for expected in EXPECTED_FAILURE_MESSAGES:
+        success, message = auth_system.login("testuser", "wrongpass")
+        assert not success
+        if expected is not None:
+            assert message == expected
+        else:
+            assert MSG_LOCKED_NOW in message
+
+    # 验证账户状态
+    account = auth_system.users["testuser"]
+    assert account.is_locked
+    assert account.lock_until is not None
+    assert account.failed_attempts == 5
+
+    # 尝试用正确密码登录，应该失败（账户被锁定）
+    success, message = auth_system.login("testuser", "Testpass123")
+    assert not success
+    assert MSG_LOCKED in message
+
+
+def test_check_lock_status(auth_system, canned_hash):
+    """测试锁定状态检查"""
+    # 放入并锁定用户
+    account = seed_user(auth_system, canned_hash)
+    account.is_locked = True
+    account.lock_until = time.time() + 600  # 锁定10分钟
+
+    # 检查锁定状态
+    is_locked, message = auth_system.check_lock_status("testuser")
+    assert is_locked
+    assert MSG_LOCKED in message
+
+    # 测试已过期的锁定
+    account.lock_until = time.time() - 100  # 锁定已过期
+    is_locked, message = auth_system.check_lock_status("testuser")
+    assert not is_locked
+    assert message is None
+
+    # 验证账户已自动解锁
+    assert not account.is_locked
+    assert account.failed_attempts == 0
+
+
+def test_unlock_account(auth_system, canned_hash):
+    """测试解锁账户"""
+    # 放入并锁定用户
+    account = seed_user(auth_system, canned_hash)
+    account.is_locked = True
+    account.lock_until = time.time() + 600
+    account.failed_attempts = 5
+
+    # 解锁账户
+    result = auth_system.unlock_account("testuser")
+    assert result
+
+    # 验证账户状态
+    assert not account.is_locked
+    assert account.lock_until is None
+    assert account.failed_attempts == 0
+
+    # 尝试解锁不存在的用户
+    result = auth_system.unlock_account("nonexistent")
+    assert not result
+
+
+def test_get_user_info(auth_system, canned_hash):
+    """测试获取用户信息"""
+    # 放入用户
+    seed_user(auth_system, canned_hash)
+
+    # 获取用户信息
+    user_info = auth_system.get_user_info("testuser")
+    assert user_info is not None
+    assert user_info['username'] == "testuser"
+    assert not user_info['is_locked']
+    assert user_info['failed_attempts'] == 0
+
+    # 获取不存在的用户信息
+    user_info = auth_system.get_user_info("nonexistent")
+    assert user_info is None
+
+
+def test_lock_expiration(auth_system, canned_hash):
+    """测试锁定过期"""
+    # 设置初始时间
+    current_time = 1000
+    auth_system._clock = lambda: current_time
+
+    # 放入并锁定用户
+    account = seed_user(auth_system, canned_hash)
+    account.is_locked = True
+    account.lock_until = current_time + 300  # 锁定5分钟
+
+    # 模拟时间过去6分钟
+    auth_system._clock = lambda: current_time + 360
+
+    # 检查锁定状态，应该自动解锁
+    is_locked, _ = auth_system.check_lock_status("testuser")
+    assert not is_locked
+    assert not account.is_locked
+    assert account.lock_until is None
+    assert account.failed_attempts == 0
+
+
+@pytest.mark.disk
+def test_save_and_load_users(auth_system, canned_hash):
+    """测试用户数据的保存和加载"""
+    # 直接放入几个用户，只在最后保存一次
+    account = seed_user(auth_system, canned_hash, "user1")
+    seed_user(auth_system, canned_hash, "user2")
+
+    # 修改一些状态
+    account.failed_attempts = 3
+
+    # 保存数据
+    auth_system.save_users()
+
+    # 创建新的AuthSystem实例加载数据
+    new_auth = AuthSystem(storage_file=auth_system.storage_file)
+
+    # 验证数据正确加载
+    assert "user1" in new_auth.users
+    assert "user2" in new_auth.users
+
+    account1 = new_auth.users["user1"]
+    assert account1.failed_attempts == 3
+
+
+@pytest.mark.disk
+def test_batch_save_deferred(auth_system, monkeypatch):
+    """测试批量操作时推迟写入文件"""
+    # 记录save_users的调用次数，同时保留真正的写入
+    save_calls = []
+    save_users = auth_system.save_users
+
+    def counting_save_users():
+        save_calls.append(1)
+        save_users()
+
+    monkeypatch.setattr(auth_system, "save_users", counting_save_users)
+
+    with auth_system:
+        auth_system.register_user("user1", "Pass12345!")
+        auth_system.register_user("user2", "Pass12345!")
+        auth_system.login("user1", "wrongpass")
+        assert not save_calls
+
+    # 退出批量操作时只写入一次
+    assert len(save_calls) == 1
+
+    # 验证数据已写入文件
+    new_auth = AuthSystem(storage_file=auth_system.storage_file)
+    assert "user1" in new_auth.users
+    assert "user2" in new_auth.users
+    assert new_auth.users["user1"].failed_attempts == 1
+
+
+@pytest.mark.disk
+def test_lazy_load_users(storage_path):
+    """测试用户数据在首次访问时才加载"""
+    storage_file = str(storage_path)
+    auth = AuthSystem(storage_file=storage_file)
+
+    # 创建实例时不读写文件
+    assert not os.path.exists(storage_file)
+
+    # 首次访问时加载，文件不存在则创建默认用户
+    assert "admin" in auth.users
+    assert os.path.exists(storage_file)
+
+
+@pytest.mark.disk
+def test_failed_load_keeps_file(storage_path, canned_hash):
+    """测试加载中途出错时不保留部分用户，也不会改写存储文件"""
+    good = {'password_hash': canned_hash.hex(), 'is_locked': False, 'lock_until': None, 'failed_attempts': 0}
+    # bob的记录缺少密码哈希，无法还原
+    storage_path.write_text(json.dumps({"alice": good, "bob": {'is_locked': False}, "carol": good}))
+    original = storage_path.read_text()
+    auth = AuthSystem(storage_file=str(storage_path))
+
+    # 每次访问都同样失败，而不是返回只加载了一部分的用户字典
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            auth.users
+    with pytest.raises(KeyError):
+        auth.register_user("dave", "Pass12345!")
+
+    # 存储文件保持原样，没有丢失任何用户
+    assert storage_path.read_text() == original
+
+
+@pytest.mark.disk
+def test_load_corrupt_password_hash(storage_path, canned_hash):
+    """测试单个用户的密码哈希损坏时只影响该用户，其余用户正常加载并保存"""
+    good = {'password_hash': canned_hash.hex(), 'is_locked': False, 'lock_until': None, 'failed_attempts': 0}
+    bad = dict(good, password_hash='not-b64!')
+    storage_path.write_text(json.dumps({"alice": good, "bob": bad, "carol": good}))
+    auth = AuthSystem(storage_file=str(storage_path))
+
+    # 哈希损坏的用户无法登录，其他用户不受影响
+    assert not auth.login("bob", "Testpass123")[0]
+    assert auth.login("alice", "Testpass123")[0]
+    auth.register_user("dave", "Pass12345!")
+
+    # 保存后所有用户都还在
+    new_auth = AuthSystem(storage_file=str(storage_path))
+    assert set(new_auth.users) == {"alice", "bob", "carol", "dave"}
+    assert new_auth.login("carol", "Testpass123")[0]
+
+
+@pytest.mark.disk
+def test_shelve_backend(tmp_path):
+    """测试shelve存储后端的保存和加载"""
+    storage_file = str(tmp_path / "users.db")
+    auth = AuthSystem(storage_file=storage_file, backend="shelve")
+    auth.register_user("user1", "Pass12345!")
+    db = auth._open_shelve()
+    auth.login("user1", "wrongpass")
+
+    # 后续读写复用同一个shelve句柄
+    assert auth._open_shelve() is db
+    auth.close()
+
+    # 创建新的AuthSystem实例加载数据
+    new_auth = AuthSystem(storage_file=storage_file, backend="shelve")
+    assert "admin" in new_auth.users
+    assert "user1" in new_auth.users
+    assert new_auth.users["user1"].failed_attempts == 1
+    new_auth.close()
+
+    # 未指定存储文件时使用shelve后端自己的默认文件，而不是JSON的users.json
+    assert AuthSystem(backend="shelve").storage_file == "users.db"
+
+    # 用shelve后端打开JSON用户文件时给出明确的错误
+    json_file = tmp_path / "users.json"
+    json_file.write_text("{}")
+    with pytest.raises(ValueError):
+        AuthSystem(storage_file=str(json_file), backend="shelve").users
+
+    # 不支持的存储后端
+    with pytest.raises(ValueError):
+        AuthSystem(storage_file=storage_file, backend="xml")
+
+
+@pytest.mark.disk
+def test_sqlite_backend(tmp_path):
+    """测试sqlite存储后端的保存和加载"""
+    storage_file = str(tmp_path / "users.sqlite3")
+    auth = AuthSystem(storage_file=storage_file, backend="sqlite")
+
+    # 注册和多次登录失败的写入都复用同一个数据库连接
+    conn = auth._connect_sqlite()
+    assert auth.register_user("newuser", "Pass12345!")[0]
+    for _ in range(5):
+        auth.login("newuser", "wrongpass")
+    assert auth._connect_sqlite() is conn
+
+    # 密码哈希以原始字节保存在BLOB列中
+    row = conn.execute("SELECT password_hash FROM users WHERE username = 'newuser'").fetchone()
+    assert row['password_hash'] == hashlib.sha256(b"Pass12345!").digest()
+    auth.close()
+
+    # 创建新的AuthSystem实例加载数据
+    new_auth = AuthSystem(storage_file=storage_file, backend="sqlite")
+    assert "admin" in new_auth.users
+    account = new_auth.users["newuser"]
+    assert account.is_locked is True
+    assert account.lock_until == auth.users["newuser"].lock_until
+    assert account.failed_attempts == 5
+    assert new_auth.login("newuser", "Pass12345!")[0] is False
+    new_auth.close()
+
+    # 与shelve后端一致，用sqlite后端打开JSON用户文件时给出明确的错误
+    json_file = tmp_path / "users.json"
+    json_file.write_text("{}")
+    with pytest.raises(ValueError):
+        AuthSystem(storage_file=str(json_file), backend="sqlite").users
+
+
+# ==================== UserAccount测试 ====================
+
+# 共享的账户模板，需要其他状态时用dataclasses.replace派生
+TEMPLATE = UserAccount(username="testuser", password_hash=b"abc123")
+
+
+def test_user_account_creation():
+    """测试UserAccount创建"""
+    account = dataclasses.replace(TEMPLATE, is_locked=True, lock_until=1234567890.0, failed_attempts=3)
+
+    assert account.username == "testuser"
+    assert account.password_hash == b"abc123"
+    assert account.is_locked
+    assert account.lock_until == 1234567890.0
+    assert account.failed_attempts == 3
+
+
+def test_user_account_default_values():
+    """测试UserAccount默认值"""
+    account = TEMPLATE
+
+    assert account.username == "testuser"
+    assert account.password_hash == b"abc123"
+    assert not account.is_locked
+    assert account.lock_until is None
+    assert account.failed_attempts == 0
+
+
+def run_tests(workers=None, verbose=False):
+    """
+    运行所有测试
     
-    return result
+    Args:
+        workers: 并行运行测试的进程数（如"auto"），需要安装pytest-xdist；
+                 为None时串行运行。等价于命令行 pytest -n auto
+        verbose: 是否逐条输出每个测试的结果，默认只输出简要结果
+    """
+    args = [__file__, "-v" if verbose else "-q", "--no-header"]
+    if workers is not None:
+        args += ["-n", str(workers), "--dist=loadscope"]
+    return pytest.main(args)
 
 
 if __name__ == "__main__":
     print("运行用户登录模块单元测试...")
-    run_tests()
\ No newline at end of file
+    run_tests()